@@ -4,130 +4,599 @@ Scan the Hansard "Quick Search" by current (Hobart) year and download any
 transcripts not yet in transcripts/ as .txt via the viewer's "As Text" option.
 
 Environment (optional):
-  WAIT_BEFORE_DOWNLOAD_SECONDS   default "15"
   MAX_PAGES                      default "5"
+  CONCURRENCY                    default "4"
 """
 
+import asyncio
+import hashlib
+import json
 import os
 import re
+import shutil
 from pathlib import Path
-from time import sleep
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlsplit, urlunsplit
 from zoneinfo import ZoneInfo
 
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
+from playwright.async_api import async_playwright, Error as PWError, TimeoutError as PWTimeout
 
 ROOT = Path(__file__).parent.resolve()
 OUT_DIR = ROOT / "transcripts"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-WAIT_BEFORE_DOWNLOAD = int(os.environ.get("WAIT_BEFORE_DOWNLOAD_SECONDS", "15"))
+# Doc ids seen on each results page last run, to stop paginating early
+PAGES_CACHE = ROOT / "results_pages.json"
+# Append-only record of every doc downloaded, one JSON object per line
+INDEX_PATH = ROOT / "seen_index.ndjson"
+# Cookies/local storage from the last run, so the site session is reused
+STATE_PATH = OUT_DIR / "state.json"
+# The viewer's "As Text" download URL with the doc id replaced by {docid},
+# learned from a real download so later docs can skip the viewer
+TEXT_URL_PATH = ROOT / "text_url_template.txt"
+DOC_ID_RE = re.compile(r"/doc/([^/?#]+)")
+# Sitting date in a result title, e.g. "House of Assembly Tuesday 3 June 2025"
+TITLE_DATE_RE = re.compile(r"(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})")
+FILENAME_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+# Query parameters that carry a session or credential; a URL with any of
+# them is never kept as a template, since the template file is committed
+SESSION_PARAM_RE = re.compile(r"token|session|sid|auth|key|sig|expires|nonce", re.IGNORECASE)
+
 MAX_PAGES = int(os.environ.get("MAX_PAGES", "5"))
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "4"))
 
 HOBART_TZ = ZoneInfo("Australia/Hobart")
 
+# Not needed to read result links or use the viewer. Stylesheets are kept:
+# the viewer's menus and the results "Next" control rely on them to show
+# and hide, and visibility checks are meaningless without them
+BLOCKED_TYPES = {"image", "font", "media"}
+
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-extensions",
+    "--disable-gpu",
+    # Document tabs work in the background concurrently; don't throttle them
+    "--disable-backgrounding-occluded-windows",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+]
+
+# Result title links (avoiding the green DOCX link) with their row's TXT
+# link, read in one round-trip as [title, href, txt_href]
+RESULT_LINKS_JS = """() => Array.from(document.querySelectorAll("td.resultColumnB a[href*='/doc/']"))
+    .filter(a => !a.innerText.includes("Download Document"))
+    .map(a => {
+        const row = a.closest("tr");
+        const txt = row && Array.from(row.querySelectorAll("a")).find(t => t.innerText.trim() === "TXT");
+        return [a.innerText.trim(), a.getAttribute("href"), txt ? txt.getAttribute("href") : null];
+    })"""
+
+# Results pagination
+NEXT_SEL = '#isys_var_nextbatch, a.page:has-text("Next")'
+
+# Result title links on a listing page (excluding the DOCX link), and the
+# index of the one for a given doc id
+RESULT_TITLE_SEL = "td.resultColumnB a[href*='/doc/']:not(:has-text('Download Document'))"
+FIND_RESULT_JS = """(links, docid) => links.findIndex(a => {
+    const m = (a.getAttribute("href") || "").match(/\\/doc\\/([^\\/?#]+)/);
+    return !!m && m[1] === docid;
+})"""
+# How long a document tab gets to show the viewer before falling back to
+# opening it from the results page, until one way has been seen to work
+VIEWER_TAB_PROBE_MS = 15000
+
+# Viewer download controls
+DOWNLOAD_MENU = '#viewer_toolbar .btn.btn-download, div[onclick*="downloadMenu"]'
+AS_TEXT_ITEM = '#viewer_toolbar_download li:has-text("As Text")'
+VIEWER_READY_JS = """() => {
+    const toolbar = document.querySelector('#viewer_toolbar');
+    const menu = document.querySelector('#viewer_toolbar .btn.btn-download, div[onclick*="downloadMenu"]');
+    return !!toolbar && !!menu
+        && !menu.classList.contains('disabled') && !menu.hasAttribute('disabled')
+        && !toolbar.classList.contains('loading')
+        && !toolbar.querySelector('[class*=loading], [class*=spinner]');
+}"""
+
+@lru_cache(maxsize=1)
+def _ensure_dirs():
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+def asset_blocker(resource_types: set):
+    async def block(route):
+        if route.request.resource_type in resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+    return block
+
+@lru_cache(maxsize=4096)
 def sanitise_filename(name: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9._-]+", "_", name).strip("_") + ".txt"
+    return FILENAME_UNSAFE_RE.sub("_", name).strip("_") + ".txt"
 
-def download_current_year_new():
-    year = datetime.now(HOBART_TZ).year
-    url = "https://www.parliament.tas.gov.au/hansard"
+_text_url_template = None
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(accept_downloads=True)
-        context.set_default_timeout(60000)
-        page = context.new_page()
+def load_text_url_template():
+    global _text_url_template
+    try:
+        _text_url_template = TEXT_URL_PATH.read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        _text_url_template = None
 
-        print(f"Opening Hansard home… ({url})")
-        page.goto(url, wait_until="domcontentloaded")
+def text_url_for(doc_url: str) -> str | None:
+    if _text_url_template:
+        return _text_url_template.replace("{docid}", doc_id(doc_url))
+    return None
 
-        # Quick Search form:
-        # form#queryForm with input#value[name="IW_FIELD_ADVANCE_PHRASE"]
-        page.wait_for_selector('#queryForm', timeout=30000)
-        page.wait_for_selector('#value', timeout=30000)
-        page.fill('#value', str(year))
-        page.click('#queryForm button[type="submit"]')
+def text_url_template(docid: str, download_url: str) -> str | None:
+    """Turn a download URL into a template on the path segment or query value holding docid."""
+    parts = urlsplit(download_url)
+    if parts.scheme not in ("http", "https"):
+        # Generated client-side (blob:/data:)
+        return None
+    if ";" in parts.path:
+        # Path parameters, e.g. ;jsessionid=
+        return None
+    matched = False
+    segments = parts.path.split("/")
+    for i, segment in enumerate(segments):
+        if unquote(segment) == docid:
+            segments[i] = "{docid}"
+            matched = True
+    pairs = parts.query.split("&") if parts.query else []
+    for i, pair in enumerate(pairs):
+        name, sep, value = pair.partition("=")
+        if SESSION_PARAM_RE.search(unquote(name)):
+            return None
+        if sep and unquote(value) == docid:
+            pairs[i] = f"{name}={{docid}}"
+            matched = True
+    if not matched:
+        # Not keyed by doc id
+        return None
+    return urlunsplit((parts.scheme, parts.netloc, "/".join(segments), "&".join(pairs), ""))
 
-        total_downloaded = 0
-        page_num = 1
-        while page_num <= MAX_PAGES:
-            print(f"Scanning results page {page_num}…")
+def learn_text_url(doc_url: str, download_url: str):
+    """Remember the URL the viewer's "As Text" option fetched, as a template."""
+    global _text_url_template
+    template = text_url_template(doc_id(doc_url), download_url)
+    if template and template != _text_url_template:
+        _text_url_template = template
+        TEXT_URL_PATH.write_text(template + "\n", encoding="utf-8")
+
+async def save_download(download, out_path: Path) -> str:
+    """Move the browser's finished download into place and return its URL."""
+    shutil.move(await download.path(), out_path)
+    return download.url
+
+# Whether the viewer renders when a document URL is opened in its own tab;
+# None until the first document has shown one way or the other
+_viewer_in_tab = None
+
+async def saved_if_download(doc_page, action, out_path: Path) -> bool:
+    """Run a navigation or click; save and return True if it yields a file download."""
+    try:
+        async with doc_page.expect_download(timeout=5000) as dl:
+            try:
+                await action()
+            except PWError:
+                # goto() aborts when the response is a download
+                pass
+        await save_download(await dl.value, out_path)
+        return True
+    except PWTimeout:
+        return False
+
+async def has_toolbar(doc_page, timeout: int) -> bool:
+    try:
+        await doc_page.wait_for_selector('#viewer_toolbar', timeout=timeout)
+        return True
+    except PWTimeout:
+        return False
+
+async def download_doc(context, doc_url: str, txt_url: str | None, out_path: Path,
+                       listing_url: str | None, download_slots: asyncio.Semaphore) -> bool:
+    """Save one document as text, directly if possible, else via the viewer."""
+    global _viewer_in_tab
+    for direct_url in filter(None, (txt_url, text_url_for(doc_url))):
+        try:
+            resp = await context.request.get(direct_url)
+        except PWError as e:
+            print(f"   Direct text URL failed ({e}); trying the next source.")
+            continue
+        content_type = resp.headers.get("content-type", "")
+        body = await resp.body() if resp.ok and "html" not in content_type else b""
+        if body.strip():
+            out_path.write_bytes(body)
+            print(f"   ✅ Saved: {out_path.name}")
+            return True
+        # A 200 with an HTML body is a login or error page, not the text, and
+        # an empty one would be recorded as downloaded for good
+        if not resp.ok:
+            reason = f"HTTP {resp.status}"
+        elif "html" in content_type:
+            reason = f"content-type {content_type!r}"
+        else:
+            reason = "an empty body"
+        print(f"   Direct text URL returned {reason}; trying the next source.")
+
+    doc_page = await context.new_page()
+    await doc_page.route("**/*", asset_blocker(BLOCKED_TYPES))
+    try:
+        viewer = False
+        if _viewer_in_tab is not False:
+            # Some documents are served straight as a file rather than in the viewer
+            if await saved_if_download(
+                doc_page, lambda: doc_page.goto(doc_url, wait_until="domcontentloaded"), out_path
+            ):
+                print(f"   ✅ Saved: {out_path.name}")
+                return True
+            viewer = await has_toolbar(doc_page, 60000 if _viewer_in_tab else VIEWER_TAB_PROBE_MS)
+            if viewer:
+                _viewer_in_tab = True
+
+        if not viewer and listing_url:
+            # The viewer is an overlay opened from the results listing; click
+            # the document's result link there, as a visitor would
+            await doc_page.goto(listing_url, wait_until="domcontentloaded")
+            links = doc_page.locator(RESULT_TITLE_SEL)
             try:
-                page.wait_for_selector('a[href*="/doc/"]', timeout=30000)
+                await links.first.wait_for(timeout=30000)
+                index = await links.evaluate_all(FIND_RESULT_JS, doc_id(doc_url))
             except PWTimeout:
-                print("No results on this page.")
-                break
+                index = -1
+            if index < 0:
+                print(f"   ❌ Result link not found for {out_path.name}; skipping.")
+                return False
+            if await saved_if_download(doc_page, links.nth(index).click, out_path):
+                print(f"   ✅ Saved: {out_path.name}")
+                return True
+            viewer = await has_toolbar(doc_page, 60000)
+            if viewer and _viewer_in_tab is None:
+                _viewer_in_tab = False
 
-            # Title links (avoid green DOCX link)
-            result_links = page.locator(
-                "td.resultColumnB a[href*='/doc/']:not(:has-text('Download Document'))"
-            )
-            count = result_links.count()
-            if count == 0:
-                print("No result links found.")
-                break
-
-            for i in range(count):
-                link = result_links.nth(i)
-                title = link.inner_text().strip()
-
-                out_path = OUT_DIR / sanitise_filename(title)
-                if out_path.exists():
-                    continue
+        # Viewer toolbar overlay
+        if not viewer:
+            print(f"   ❌ Viewer toolbar not found for {out_path.name}; skipping.")
+            return False
 
-                print(f"→ Opening: {title}")
+        # Wait for the viewer to wire up its download menu instead of a fixed delay
+        try:
+            await doc_page.wait_for_function(VIEWER_READY_JS, timeout=30000)
+        except PWTimeout:
+            pass
+
+        async with download_slots:
+            # Open download menu and choose "As Text"; retry briefly in case
+            # the toolbar was not quite ready
+            for attempt in range(3):
+                await doc_page.click(DOWNLOAD_MENU)
                 try:
-                    with page.expect_download(timeout=5000) as dl:
-                        link.click()
-                    download = dl.value
-                    download.save_as(str(out_path))
-                    print(f"   ✅ Saved: {out_path.name}")
-                    total_downloaded += 1
-                    continue
+                    await doc_page.wait_for_selector(AS_TEXT_ITEM, timeout=5000)
+                    break
                 except PWTimeout:
-                    pass
+                    if attempt == 2:
+                        raise
+                    await asyncio.sleep(0.5)
+
+            async with doc_page.expect_download(timeout=60000) as dl:
+                await doc_page.click(AS_TEXT_ITEM)
+            learn_text_url(doc_url, await save_download(await dl.value, out_path))
+        print(f"   ✅ Saved: {out_path.name}")
+        return True
+    finally:
+        await doc_page.close()
+
+class ResultsPageParser(HTMLParser):
+    """Pull document title links and the next-batch link out of a results page."""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self.next_href = None
+        self.has_next = False
+        self._in_result_cell = False
+        self._anchor = None
+        self._row_start = 0
+        self._row_txt = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if attrs.get("id") == "isys_var_nextbatch":
+            self.has_next = True
+        if tag == "tr":
+            self._row_start = len(self.links)
+            self._row_txt = None
+        elif tag == "td":
+            self._in_result_cell = "resultColumnB" in classes
+        elif tag == "a":
+            is_next = attrs.get("id") == "isys_var_nextbatch"
+            self._anchor = (attrs.get("href") or "", is_next, "page" in classes, [])
+
+    def handle_data(self, data):
+        if self._anchor:
+            self._anchor[3].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "td":
+            self._in_result_cell = False
+        elif tag == "a" and self._anchor:
+            href, is_next, is_page, parts = self._anchor
+            self._anchor = None
+            text = " ".join("".join(parts).split())
+            if is_page and "Next" in text:
+                is_next = self.has_next = True
+            if is_next:
+                if href and not href.startswith(("#", "javascript:")):
+                    self.next_href = href
+            elif text == "TXT" and href and not href.startswith(("#", "javascript:")):
+                # Direct text download for the title link(s) in the same row
+                self._row_txt = href
+                for link in self.links[self._row_start:]:
+                    link[2] = link[2] or href
+            # Title links (avoid green DOCX link)
+            elif self._in_result_cell and "/doc/" in href and "Download Document" not in text:
+                self.links.append([text, href, self._row_txt])
+
+async def fetch_results_page(context, url: str) -> ResultsPageParser:
+    # context.request shares the browser's cookies and keeps connections
+    # to the search host alive between pages
+    resp = await context.request.get(url, timeout=30000)
+    parser = ResultsPageParser()
+    if resp.ok:
+        parser.feed(await resp.text())
+    else:
+        print(f"Results page returned HTTP {resp.status}.")
+    return parser
+
+def doc_id(doc_url: str) -> str:
+    m = DOC_ID_RE.search(doc_url)
+    return m.group(1) if m else doc_url
 
-                # Viewer toolbar overlay
+def load_pages_cache() -> dict:
+    """Return {page number: [[doc id, filename], ...]} as seen on the previous run."""
+    try:
+        return json.loads(PAGES_CACHE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_pages_cache(cache: dict):
+    PAGES_CACHE.write_text(json.dumps(cache, separators=(",", ":")), encoding="utf-8")
+
+def load_seen_index() -> dict:
+    """Replay the download log into {doc id: transcript filename}."""
+    seen = {}
+    try:
+        with INDEX_PATH.open(encoding="utf-8") as f:
+            for line in f:
                 try:
-                    page.wait_for_selector('#viewer_toolbar', timeout=60000)
-                except PWTimeout:
-                    print("   ❌ Viewer toolbar not found; skipping.")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Partial last line from an interrupted run
                     continue
+                seen[entry["docid"]] = entry["path"]
+    except FileNotFoundError:
+        pass
+    return seen
 
-                # Safety delay
-                print(f"   Waiting {WAIT_BEFORE_DOWNLOAD}s before download…")
-                sleep(WAIT_BEFORE_DOWNLOAD)
+def append_seen(docid: str, path: Path):
+    """Record one finished download, flushed so a later crash can't lose it."""
+    entry = {
+        "docid": docid,
+        "path": path.name,
+        "hash": hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest(),
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with INDEX_PATH.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
 
-                # Open download menu
-                page.click('#viewer_toolbar .btn.btn-download, div[onclick*="downloadMenu"]')
+def list_existing() -> set:
+    """Names of transcripts already on disk, from one directory scan."""
+    with os.scandir(OUT_DIR) as entries:
+        return {e.name for e in entries}
 
-                # Choose "As Text"
-                page.wait_for_selector('#viewer_toolbar_download li:has-text("As Text")', timeout=60000)
-                with page.expect_download(timeout=60000) as dl:
-                    page.click('#viewer_toolbar_download li:has-text("As Text")')
-                download = dl.value
-                download.save_as(str(out_path))
-                print(f"   ✅ Saved: {out_path.name}")
-                total_downloaded += 1
+def title_date(title: str):
+    m = TITLE_DATE_RE.search(title)
+    if m:
+        try:
+            return datetime.strptime(" ".join(m.groups()), "%d %B %Y")
+        except ValueError:
+            pass
+    return None
 
-                # Close viewer
-                try:
-                    page.click('#viewer_toolbar .btn.btn-close')
-                    sleep(0.5)
-                except PWTimeout:
-                    pass
+def newest_first(links) -> bool:
+    """Whether the dated titles on a results page run from newest to oldest."""
+    dates = [d for d in (title_date(title) for title, *_ in links) if d]
+    return dates == sorted(dates, reverse=True)
+
+def add_page(docs: dict, cache: dict, seen: dict, existing: set, page_num: int, links) -> bool:
+    """Queue unseen docs from one results page.
+
+    Returns True when the page lists exactly what it did last run and every
+    doc on it is already downloaded: nothing new has been published ahead
+    of it, so there is no need to walk further.
+    """
+    entries = [[doc_id(doc_url), sanitise_filename(title)] for title, doc_url, *_ in links]
+    unchanged = cache.get(str(page_num)) == entries
+    cache[str(page_num)] = entries
+
+    all_seen = True
+    for (title, doc_url, txt_url, listing_url), (docid, filename) in zip(links, entries):
+        if docid in seen or filename in existing:
+            continue
+        all_seen = False
+        docs.setdefault(OUT_DIR / filename, (title, doc_url, txt_url, listing_url))
+
+    if unchanged and all_seen:
+        # A doc further on that failed last run would never be retried
+        later = [e for num, page in cache.items() if int(num) > page_num for e in page]
+        if not all(isinstance(e, list) and (e[0] in seen or e[1] in existing) for e in later):
+            print("Page unchanged, but later pages have docs still to fetch; walking on.")
+            return False
+        # The quick search sets no sort order. Only a newest-first listing
+        # guarantees new sittings appear ahead of this page
+        if not newest_first(links):
+            print("Page unchanged but not listed newest-first; walking on.")
+            return False
+        print("Page unchanged since last run; stopping.")
+        return True
+    return False
+
+async def collect_new_docs(page):
+    """Walk the results pages and return (title, url, txt_url, out_path, listing_url) for unseen docs.
+
+    Results pages are plain HTML, so they are fetched over HTTP with the
+    browser's cookies rather than rendered. If the listing can't be read
+    that way, fall back to walking it in the browser.
+    """
+    await page.wait_for_load_state("domcontentloaded")
+    url = page.url
+
+    docs = {}
+    cache = load_pages_cache()
+    seen = load_seen_index()
+    existing = list_existing()
+    for page_num in range(1, MAX_PAGES + 1):
+        print(f"Scanning results page {page_num}…")
+        try:
+            results = await fetch_results_page(page.context, url)
+        except PWError as e:
+            print(f"Could not fetch results page: {e}")
+            results = ResultsPageParser()
+
+        if not results.links:
+            if page_num == 1:
+                return await collect_new_docs_browser(page, cache, seen, existing)
+            print("No result links found.")
+            break
+        if page_num == 1 and results.has_next and not results.next_href:
+            # Pagination needs JS from the start; the browser walk can follow it
+            return await collect_new_docs_browser(page, cache, seen, existing)
+
+        links = [
+            (title, urljoin(url, href), txt_href and urljoin(url, txt_href), url)
+            for title, href, txt_href in results.links
+        ]
+        if add_page(docs, cache, seen, existing, page_num, links):
+            break
+
+        # Next page?
+        if not results.next_href:
+            if results.has_next:
+                print("Next page link needs JavaScript; stopping.")
+            break
+        url = urljoin(url, results.next_href)
+
+    save_pages_cache(cache)
+    return [(title, doc_url, txt_url, out_path, listing_url)
+            for out_path, (title, doc_url, txt_url, listing_url) in docs.items()]
+
+async def try_click_next(page) -> bool:
+    """Click the results "Next" control if there is a visible one."""
+    next_btn = page.locator(NEXT_SEL).first
+    # is_visible() is False when nothing matches, so this is one round-trip
+    if not await next_btn.is_visible():
+        return False
+    try:
+        await next_btn.click()
+    except PWError:
+        return False
+    return True
+
+async def collect_new_docs_browser(page, cache: dict, seen: dict, existing: set):
+    """Walk the results pages in the browser, for listings that need JS."""
+    docs = {}
+    page_num = 1
+    while page_num <= MAX_PAGES:
+        if page_num > 1:
+            print(f"Scanning results page {page_num} in browser…")
+        try:
+            await page.wait_for_selector('a[href*="/doc/"]', timeout=30000)
+        except PWTimeout:
+            print("No results on this page.")
+            break
 
-            # Next page?
-            next_btn = page.locator('#isys_var_nextbatch, a.page:has-text("Next")')
-            if next_btn.count() > 0 and next_btn.first.is_visible():
-                next_btn.first.click()
-                page_num += 1
-            else:
-                break
+        rows = await page.evaluate(RESULT_LINKS_JS)
+        if not rows:
+            print("No result links found.")
+            break
+
+        links = [
+            (title, urljoin(page.url, href), txt_href and urljoin(page.url, txt_href), page.url)
+            for title, href, txt_href in rows
+        ]
+        if add_page(docs, cache, seen, existing, page_num, links):
+            break
+
+        # Next page?
+        if not await try_click_next(page):
+            break
+        page_num += 1
+
+    save_pages_cache(cache)
+    return [(title, doc_url, txt_url, out_path, listing_url)
+            for out_path, (title, doc_url, txt_url, listing_url) in docs.items()]
+
+async def download_current_year_new():
+    _ensure_dirs()
+    year = datetime.now(HOBART_TZ).year
+    url = "https://www.parliament.tas.gov.au/hansard"
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        context = await browser.new_context(
+            accept_downloads=True,
+            storage_state=str(STATE_PATH) if STATE_PATH.exists() else None,
+        )
+        context.set_default_timeout(60000)
+        page = await context.new_page()
+        await page.route("**/*", asset_blocker(BLOCKED_TYPES))
+
+        print(f"Opening Hansard home… ({url})")
+        await page.goto(url, wait_until="domcontentloaded")
+
+        # Quick Search form:
+        # form#queryForm with input#value[name="IW_FIELD_ADVANCE_PHRASE"]
+        await page.wait_for_selector('#queryForm', timeout=30000)
+        await page.wait_for_selector('#value', timeout=30000)
+        await page.fill('#value', str(year))
+        await page.click('#queryForm button[type="submit"]')
+
+        docs = await collect_new_docs(page)
+        load_text_url_template()
+
+        # Each document spends most of its time waiting on the viewer, so
+        # several can be in flight at once in the same context. One extra tab
+        # is allowed to load its viewer ahead of the downloads in progress.
+        tab_slots = asyncio.Semaphore(CONCURRENCY + 1)
+        download_slots = asyncio.Semaphore(CONCURRENCY)
+
+        async def bounded(title, doc_url, txt_url, out_path, listing_url):
+            async with tab_slots:
+                print(f"→ Opening: {title}")
+                saved = await download_doc(
+                    context, doc_url, txt_url, out_path, listing_url, download_slots
+                )
+                if saved:
+                    append_seen(doc_id(doc_url), out_path)
+                return saved
+
+        results = await asyncio.gather(*(bounded(*d) for d in docs), return_exceptions=True)
+        total_downloaded = 0
+        for (title, *_), result in zip(docs, results):
+            if isinstance(result, Exception):
+                print(f"   ❌ {title}: {result}")
+            elif result:
+                total_downloaded += 1
 
-        browser.close()
+        await context.storage_state(path=str(STATE_PATH))
+        await browser.close()
         print(f"Done. New downloads this run: {total_downloaded}")
 
 if __name__ == "__main__":
-    download_current_year_new()
+    asyncio.run(download_current_year_new())
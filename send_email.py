@@ -1,38 +1,109 @@
 import os
 import re
-import glob
+import gzip
+import mmap
+import shutil
+import smtplib
+import ssl
+import tempfile
+import time
+from bisect import bisect_right
+from itertools import chain, repeat
 from pathlib import Path
 from datetime import datetime
-
-import yagmail
+from email.message import EmailMessage
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 
 
 # File that records which transcripts have already been emailed
 LOG_FILE = Path("sent.log")
 
+# Sitting dates are Tasmanian; date the digest subject the same way
+HOBART_TZ = ZoneInfo("Australia/Hobart")
+
 # Regexes for speaker detection and headings
 SPEAKER_RE = re.compile(
     r"^((?:The\s+)?(?:Mr|Ms|Mrs|Dr|Hon|Sir|Madam|Premier|Treasurer|Attorney-General|Leader)\s+"
     r"[A-Z][A-Za-z’'\-]+(?:\s+[A-Z][A-Za-z’'\-]+)*(?:\s*\([^)]+\))?)\s*-\s*",
 )
 HEADING_RE = re.compile(r"^[A-Z0-9 ,’'()\-.:]{6,}$")
+MEMBERS_RE = re.compile(r"^Members\s+—")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# Quote characters that may wrap a phrase in keywords.txt
+QUOTE_PAIRS = (('"', '"'), ("'", "'"), ("“", "”"))
+# Dates in transcript filenames, e.g. "..._Tuesday_3_June_2025.txt"
+DATE_RE = re.compile(r"(\d{1,2})[ _]([A-Za-z]+)[ _](\d{4})")
+MONTHS = {
+    name: i
+    for i, name in enumerate(
+        (
+            "january", "february", "march", "april", "may", "june", "july",
+            "august", "september", "october", "november", "december",
+        ),
+        1,
+    )
+}
 
 
 # --- Helpers -----------------------------------------------------------------
 
 def load_keywords():
     """Load keywords from keywords.txt or KEYWORDS env var."""
-    if os.path.exists("keywords.txt"):
+    try:
+        mtime = os.stat("keywords.txt").st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    return _load_keywords_cached(mtime, os.environ.get("KEYWORDS"))
+
+
+@lru_cache(maxsize=4)
+def _load_keywords_cached(mtime, env):
+    """Parse keywords; re-read only when keywords.txt or KEYWORDS changes."""
+    if mtime is not None:
         with open("keywords.txt", encoding="utf-8") as f:
-            return [kw.strip() for kw in f if kw.strip()]
-    if "KEYWORDS" in os.environ:
-        return [kw.strip() for kw in os.environ["KEYWORDS"].split(",") if kw.strip()]
-    return []
+            terms = list(f)
+    elif env is not None:
+        terms = env.split(",")
+    else:
+        return ()
+    keywords = []
+    for term in terms:
+        term = term.strip()
+        # Skip blanks and "# section" comments; quotes mark an exact phrase
+        if not term or term[0] == "#":
+            continue
+        if len(term) >= 2 and (term[0], term[-1]) in QUOTE_PAIRS:
+            term = term[1:-1].strip()
+            if not term:
+                continue
+        keywords.append(term)
+    return tuple(keywords)
 
 
 def split_paragraphs(text: str):
-    """Split transcript into paragraphs."""
-    return re.split(r"\n\s*\n", text)
+    """Yield transcript paragraphs, slicing each one only as it is reached."""
+    start = 0
+    for m in PARAGRAPH_SPLIT_RE.finditer(text):
+        yield text[start:m.start()]
+        start = m.end()
+    yield text[start:]
+
+
+@lru_cache(maxsize=None)
+def keyword_patterns(keywords):
+    """Compile the per-keyword and combined patterns once per keyword tuple."""
+    # A keyword containing a sentence break can't be located by offset alone
+    kw_patterns = [
+        (kw, re.compile(rf"\b{re.escape(kw)}\b", re.IGNORECASE), bool(SENTENCE_SPLIT_RE.search(kw)))
+        for kw in keywords
+    ]
+    # One pass to tell whether a paragraph mentions any keyword at all
+    any_kw_re = re.compile(
+        "|".join(rf"\b{re.escape(kw)}\b" for kw in keywords) or r"(?!)", re.IGNORECASE
+    )
+    return kw_patterns, any_kw_re, [kw.lower() for kw in keywords]
 
 
 def extract_matches(text: str, keywords):
@@ -41,6 +112,7 @@ def extract_matches(text: str, keywords):
     current_speaker = None
     seen = set()
     paragraphs = split_paragraphs(text)
+    kw_patterns, any_kw_re, kws_lower = keyword_patterns(tuple(keywords))
 
     for para in paragraphs:
         lines = [line.rstrip() for line in para.strip().splitlines()]
@@ -49,7 +121,7 @@ def extract_matches(text: str, keywords):
 
         first_line = lines[0].strip()
         # Skip headings or other non-speech markers
-        if HEADING_RE.match(first_line) or first_line.startswith("[") or re.match(r"^Members\s+—", first_line):
+        if HEADING_RE.match(first_line) or first_line.startswith("[") or MEMBERS_RE.match(first_line):
             continue
 
         m = SPEAKER_RE.match(first_line)
@@ -64,70 +136,161 @@ def extract_matches(text: str, keywords):
         content = "\n".join(lines).strip()
         if not content:
             continue
+        # Plain substring tests rule out most paragraphs far more cheaply than
+        # the regex; it only has to confirm word boundaries on the rest
+        lowered = content.lower()
+        if not any(kw in lowered for kw in kws_lower) or not any_kw_re.search(content):
+            continue
 
-        for kw in keywords:
-            if re.search(rf"\b{re.escape(kw)}\b", content, re.IGNORECASE):
-                sentences = re.split(r"(?<=[.!?])\s+", content)
-                for i, s in enumerate(sentences):
-                    if re.search(rf"\b{re.escape(kw)}\b", s, re.IGNORECASE):
-                        start = max(0, i - 1)
-                        end = min(len(sentences), i + 2)
-                        snippet = " ".join(sentences[start:end]).strip()
-                        key = ((current_speaker or "").lower(), snippet.lower())
-                        if key in seen:
-                            break
-                        seen.add(key)
-                        results.append((kw, snippet, current_speaker))
-                        break
+        # Split once per paragraph, not once per keyword that hits it, and
+        # keep each sentence's start offset
+        sentences = []
+        starts = [0]
+        for b in SENTENCE_SPLIT_RE.finditer(content):
+            sentences.append(content[starts[-1]:b.start()])
+            starts.append(b.end())
+        sentences.append(content[starts[-1]:])
+
+        for kw, kw_re, spans_sentences in kw_patterns:
+            m = kw_re.search(content)
+            if not m:
+                continue
+            if spans_sentences:
+                i = next((i for i, s in enumerate(sentences) if kw_re.search(s)), None)
+                if i is None:
+                    continue
+            else:
+                # The first hit in the paragraph lies in the first sentence
+                # that contains the keyword
+                i = bisect_right(starts, m.start()) - 1
+            start = max(0, i - 1)
+            end = min(len(sentences), i + 2)
+            snippet = " ".join(sentences[start:end]).strip()
+            key = ((current_speaker or "").lower(), snippet.lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append((kw, snippet, current_speaker))
     return results
 
 
+@lru_cache(maxsize=None)
+def keywords_bytes_re(keywords):
+    """Byte pattern matching wherever any keyword could match, or None.
+
+    Only built for ASCII keywords, where byte-level case folding and word
+    boundaries never miss a match the str pattern would find.
+    """
+    if not keywords or not all(kw.isascii() for kw in keywords):
+        return None
+    return re.compile(
+        b"|".join(rb"\b" + re.escape(kw.encode()) + rb"\b" for kw in keywords), re.IGNORECASE
+    )
+
+
+def scan_file(path, keywords):
+    """Read one transcript and return its keyword matches."""
+    if not keywords:
+        return []
+    any_kw_re = keywords_bytes_re(tuple(keywords))
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Each file is scanned front to back; let the kernel read ahead
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # Search the mapped file before decoding it; most transcripts can
+            # be ruled out without building a str at all. ASCII-lowered
+            # substring tests reject a file faster than the regex can
+            if any_kw_re is not None:
+                lowered = mm[:].lower()
+                if not any(kw.lower().encode() in lowered for kw in keywords):
+                    return []
+                del lowered
+                if not any_kw_re.search(mm):
+                    return []
+            # Decode straight from the mapping, without a bytes copy alongside
+            text = str(mm, "utf-8", "ignore")
+    # Match read_text()'s universal newlines
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return extract_matches(text, keywords)
+
+
 def parse_date_from_filename(filename: str):
     """Extract datetime from Hansard filename."""
-    m = re.search(r"(\d{1,2} \w+ \d{4})", filename)
+    m = DATE_RE.search(filename)
     if m:
+        day, month, year = m.groups()
         try:
-            return datetime.strptime(m.group(1), "%d %B %Y")
-        except ValueError:
+            return datetime(int(year), MONTHS[month.lower()], int(day))
+        except (KeyError, ValueError):
             return datetime.min
     return datetime.min
 
 
-def build_digest(files, keywords):
-    """Build the digest body text for email."""
-    body_lines = []
+def build_digest(files, keywords, now=None):
+    """Build the digest body text for email, stamped at epoch seconds now."""
+    # Process each transcript file
+    files = sorted(files, key=lambda x: parse_date_from_filename(Path(x).name))
+    all_matches = list(map(scan_file, files, repeat(keywords)))
+    total_matches = sum(map(len, all_matches))
 
     # Header
-    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    body_lines.append(f"Time: {now}")
-    body_lines.append("Keywords: " + ", ".join(keywords))
-
-    # Process each transcript file
-    total_matches = 0
-    for f in sorted(files, key=lambda x: parse_date_from_filename(Path(x).name)):
-        text = Path(f).read_text(encoding="utf-8", errors="ignore")
-        matches = extract_matches(text, keywords)
+    stamp = time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(now))
+    header_lines = [
+        f"Time: {stamp}",
+        "Keywords: " + ", ".join(keywords),
+        f"Matches found: {total_matches}\n",
+    ]
+
+    match_lines = []
+    for f, matches in zip(files, all_matches):
         if not matches:
             continue
-        total_matches += len(matches)
 
-        body_lines.append(f"\n=== {Path(f).name} ===")
+        match_lines.append(f"\n=== {Path(f).name} ===")
         for i, (kw, snippet, speaker) in enumerate(matches, 1):
             if speaker:
-                body_lines.append(f"🔹 Match #{i} ({speaker})")
+                match_lines.append(f"🔹 Match #{i} ({speaker})")
             else:
-                body_lines.append(f"🔹 Match #{i}")
-            body_lines.append(snippet)
-            body_lines.append("")
-
-    body_lines.insert(2, f"Matches found: {total_matches}\n")
+                match_lines.append(f"🔹 Match #{i}")
+            match_lines.append(snippet)
+            match_lines.append("")
 
     if total_matches == 0:
-        body_lines.append("\n(No keyword matches found.)")
+        match_lines.append("\n(No keyword matches found.)")
     else:
-        body_lines.append("(Full transcript(s) attached.)")
+        match_lines.append("(Full transcript(s) attached.)")
+
+    return "\n".join(chain(header_lines, match_lines)), total_matches
+
+
+def list_transcripts(folder="transcripts"):
+    """Return sorted paths of the .txt transcripts in folder, in one scan."""
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(
+                e.path for e in entries if e.name.endswith(".txt") and e.is_file()
+            )
+    except FileNotFoundError:
+        return []
 
-    return "\n".join(body_lines), total_matches
+
+def gzip_attachments(files, folder):
+    """Write a gzipped copy of each non-empty file into folder; return their paths."""
+    paths = []
+    for file in files:
+        with open(file, "rb") as src:
+            # An empty transcript has nothing to attach
+            if os.fstat(src.fileno()).st_size == 0:
+                continue
+            out = Path(folder) / f"{Path(file).name}.gz"
+            with gzip.open(out, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+        paths.append(str(out))
+    return paths
 
 
 def load_sent_log():
@@ -144,6 +307,31 @@ def update_sent_log(files):
             f.write(f"{Path(file).name}\n")
 
 
+def build_message(sender, to, subject, body, attachments=()):
+    """Build a plain-text email with the given files attached as gzip."""
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = ", ".join(to)
+    msg["Subject"] = subject
+    msg.set_content(body)
+    for path in attachments:
+        with open(path, "rb") as f:
+            msg.add_attachment(
+                f.read(), maintype="application", subtype="gzip", filename=Path(path).name
+            )
+    return msg
+
+
+def send_all(messages, user, password):
+    """Send each EmailMessage over one SMTP connection."""
+    # One authenticated connection for the whole batch, closed on exit
+    with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
+        smtp.starttls(context=ssl.create_default_context())
+        smtp.login(user, password)
+        for msg in messages:
+            smtp.send_message(msg)
+
+
 # --- Main --------------------------------------------------------------------
 
 def main():
@@ -155,7 +343,7 @@ def main():
     if not keywords:
         raise SystemExit("No keywords found (keywords.txt or KEYWORDS env var).")
 
-    all_files = sorted(glob.glob("transcripts/*.txt"))
+    all_files = list_transcripts()
     if not all_files:
         raise SystemExit("No transcripts found in transcripts/")
 
@@ -165,26 +353,17 @@ def main():
         print("No new transcripts to email.")
         return
 
-    body, total_hits = build_digest(files, keywords)
+    # Read the clock once so the subject and the digest header agree
+    now = time.time()
+    body, total_hits = build_digest(files, keywords, now)
 
-    subject = f"Hansard keyword digest — {datetime.now().strftime('%d %b %Y')}"
+    subject = f"Hansard keyword digest — {datetime.fromtimestamp(now, HOBART_TZ):%d %b %Y}"
     to_list = [addr.strip() for addr in re.split(r"[,\s]+", EMAIL_TO) if addr.strip()]
 
-    yag = yagmail.SMTP(
-        user=EMAIL_USER,
-        password=EMAIL_PASS,
-        host="smtp.gmail.com",
-        port=587,
-        smtp_starttls=True,
-        smtp_ssl=False,
-    )
-
-    yag.send(
-        to=to_list,
-        subject=subject,
-        contents=body,
-        attachments=files,
-    )
+    # Transcripts compress about 3x, so attach gzipped copies to cut upload size
+    with tempfile.TemporaryDirectory() as tmp:
+        msg = build_message(EMAIL_USER, to_list, subject, body, gzip_attachments(files, tmp))
+        send_all([msg], EMAIL_USER, EMAIL_PASS)
 
     update_sent_log(files)
 
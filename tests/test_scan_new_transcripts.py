@@ -0,0 +1,150 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import scan_new_transcripts as scan
+
+
+RESULTS_HTML = """
+<table>
+  <tr>
+    <td class="resultColumnA"><a href="/doc/skip">Outside the result column</a></td>
+    <td class="resultColumnB">
+      <a href="/doc/ha-2025-09-09">House of Assembly Tuesday 9 September 2025</a>
+      <a href="/doc/ha-2025-09-09?docx">Download Document</a>
+      <a href="/txt/ha-2025-09-09.txt">TXT</a>
+    </td>
+  </tr>
+  <tr>
+    <td class="resultColumnB">
+      <a href="/txt/lc-2025-08-19.txt">TXT</a>
+      <a href="/doc/lc-2025-08-19">Legislative Council Tuesday 19 August 2025</a>
+    </td>
+  </tr>
+  <tr>
+    <td class="resultColumnB"><a href="/doc/ha-2025-06-03">House of Assembly Tuesday 3 June 2025</a></td>
+    <td><a href="javascript:void(0)">TXT</a></td>
+  </tr>
+</table>
+"""
+
+
+def parse(html):
+    parser = scan.ResultsPageParser()
+    parser.feed(html)
+    return parser
+
+
+def test_results_page_parser_links():
+    parser = parse(RESULTS_HTML)
+    assert parser.links == [
+        ["House of Assembly Tuesday 9 September 2025", "/doc/ha-2025-09-09", "/txt/ha-2025-09-09.txt"],
+        ["Legislative Council Tuesday 19 August 2025", "/doc/lc-2025-08-19", "/txt/lc-2025-08-19.txt"],
+        ["House of Assembly Tuesday 3 June 2025", "/doc/ha-2025-06-03", None],
+    ]
+    assert not parser.has_next
+    assert parser.next_href is None
+
+
+def test_results_page_parser_next_links():
+    parser = parse(RESULTS_HTML + '<a id="isys_var_nextbatch" href="?page=2">Next</a>')
+    assert parser.has_next and parser.next_href == "?page=2"
+
+    parser = parse(RESULTS_HTML + '<a class="page" href="?page=2"> Next &raquo;</a>')
+    assert parser.has_next and parser.next_href == "?page=2"
+
+    # JS-only controls still count as a next page, but can't be followed
+    for href in ("#", "javascript:nextBatch()"):
+        parser = parse(RESULTS_HTML + f'<a class="page" href="{href}">Next</a>')
+        assert parser.has_next and parser.next_href is None
+
+
+def test_add_page_stops_on_unchanged_seen_page():
+    links = [
+        ("House of Assembly Tuesday 9 September 2025", "https://x/doc/a", None, "https://x/r"),
+        ("Legislative Council Tuesday 19 August 2025", "https://x/doc/b", None, "https://x/r"),
+    ]
+    cache, docs = {}, {}
+    seen = {"a": "a.txt"}
+    b_file = scan.sanitise_filename(links[1][0])
+    existing = {b_file}
+
+    # First sighting of the page: nothing cached to compare against
+    assert not scan.add_page(docs, cache, seen, existing, 1, links)
+    assert cache == {"1": [["a", scan.sanitise_filename(links[0][0])], ["b", b_file]]}
+    assert docs == {}
+    # Same page again, everything downloaded
+    assert scan.add_page(docs, cache, seen, existing, 1, links)
+
+    # An unseen doc keeps the walk going and is queued
+    assert not scan.add_page(docs, cache, {}, set(), 1, links)
+    assert len(docs) == 2
+
+    # Not newest-first: can't rule out new docs further on
+    reordered = links[::-1]
+    cache = {}
+    scan.add_page({}, cache, seen, existing, 1, reordered)
+    assert not scan.add_page({}, cache, seen, existing, 1, reordered)
+
+
+def test_add_page_walks_on_for_later_unfetched_docs():
+    links = [
+        ("House of Assembly Tuesday 9 September 2025", "https://x/doc/a", None, "https://x/r"),
+    ]
+    seen = {"a": "a.txt", "b": "b.txt"}
+    cache = {}
+    scan.add_page({}, cache, seen, set(), 1, links)
+
+    # Page 2 last run listed a doc that was never downloaded
+    cache["2"] = [["b", "b.txt"], ["c", "c.txt"]]
+    assert not scan.add_page({}, cache, seen, set(), 1, links)
+    # ...until it is on disk
+    assert scan.add_page({}, cache, seen, {"c.txt"}, 1, links)
+
+    # Cache entries from before filenames were recorded can't be checked
+    cache["2"] = ["b"]
+    assert not scan.add_page({}, cache, seen, set(), 1, links)
+
+
+def test_load_seen_index_skips_truncated_line(tmp_path, monkeypatch):
+    index = tmp_path / "seen_index.ndjson"
+    index.write_text(
+        '{"docid": "a", "path": "a.txt", "hash": "00", "ts": "2025-06-03T00:00:00+00:00"}\n'
+        '{"docid": "b", "path": "b.txt"',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(scan, "INDEX_PATH", index)
+    assert scan.load_seen_index() == {"a": "a.txt"}
+
+    monkeypatch.setattr(scan, "INDEX_PATH", tmp_path / "missing.ndjson")
+    assert scan.load_seen_index() == {}
+
+
+def test_text_url_template():
+    template = scan.text_url_template
+    assert template("abc", "https://h/doc/abc/text?fmt=txt") == "https://h/doc/{docid}/text?fmt=txt"
+    assert template("abc", "https://h/export?id=abc&fmt=txt") == "https://h/export?id={docid}&fmt=txt"
+    # Only the part holding the id is replaced, never the host or other values
+    assert template("abc", "https://abc.h/doc/abc?q=abcd") == "https://abc.h/doc/{docid}?q=abcd"
+    # Not keyed by the doc id, generated client-side, or carrying a session
+    assert template("abc", "https://h/export?id=abcd") is None
+    assert template("abc", "blob:https://h/1234") is None
+    assert template("abc", "https://h/export?id=abc&token=s3cret") is None
+    assert template("abc", "https://h/export;jsessionid=s3cret?id=abc") is None
+
+
+def test_learn_text_url_round_trip(tmp_path, monkeypatch):
+    path = tmp_path / "text_url_template.txt"
+    monkeypatch.setattr(scan, "TEXT_URL_PATH", path)
+    monkeypatch.setattr(scan, "_text_url_template", None)
+    assert scan.text_url_for("https://h/doc/xyz") is None
+
+    scan.learn_text_url("https://h/doc/abc", "https://h/export?id=abc&fmt=txt")
+    assert path.read_text(encoding="utf-8") == "https://h/export?id={docid}&fmt=txt\n"
+    assert scan.text_url_for("https://h/doc/xyz") == "https://h/export?id=xyz&fmt=txt"
+
+    # A URL that can't be a template leaves the learned one alone
+    scan.learn_text_url("https://h/doc/abc", "https://h/export?id=abc&sessionid=1")
+    scan.load_text_url_template()
+    assert scan.text_url_for("https://h/doc/xyz") == "https://h/export?id=xyz&fmt=txt"
@@ -0,0 +1,169 @@
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import send_email
+
+TRANSCRIPTS = Path(__file__).resolve().parents[1] / "transcripts"
+
+
+def reference_extract_matches(text, keywords):
+    """The original per-keyword, per-sentence search, kept as an oracle."""
+    results = []
+    current_speaker = None
+    seen = set()
+    for para in re.split(r"\n\s*\n", text):
+        lines = [line.rstrip() for line in para.strip().splitlines()]
+        if not lines:
+            continue
+        first_line = lines[0].strip()
+        if (
+            send_email.HEADING_RE.match(first_line)
+            or first_line.startswith("[")
+            or re.match(r"^Members\s+—", first_line)
+        ):
+            continue
+        m = send_email.SPEAKER_RE.match(first_line)
+        if m:
+            current_speaker = m.group(1) + " -"
+            remainder = first_line[m.end():].strip()
+            if remainder:
+                lines[0] = remainder
+            else:
+                lines = lines[1:]
+        content = "\n".join(lines).strip()
+        if not content:
+            continue
+        for kw in keywords:
+            if re.search(rf"\b{re.escape(kw)}\b", content, re.IGNORECASE):
+                sentences = re.split(r"(?<=[.!?])\s+", content)
+                for i, s in enumerate(sentences):
+                    if re.search(rf"\b{re.escape(kw)}\b", s, re.IGNORECASE):
+                        snippet = " ".join(sentences[max(0, i - 1):i + 2]).strip()
+                        key = ((current_speaker or "").lower(), snippet.lower())
+                        if key in seen:
+                            break
+                        seen.add(key)
+                        results.append((kw, snippet, current_speaker))
+                        break
+    return results
+
+
+def test_keywords_map_to_their_own_sentences():
+    text = (
+        "Mr John Doe - One. Two has apples. Three. Four. Five has pears. Six.\n\n"
+        "Ms Jane Roe - Apples again."
+    )
+    assert send_email.extract_matches(text, ["pears", "apple", "apples"]) == [
+        ("pears", "Four. Five has pears. Six.", "Mr John Doe -"),
+        ("apples", "One. Two has apples. Three.", "Mr John Doe -"),
+        ("apples", "Apples again.", "Ms Jane Roe -"),
+    ]
+
+
+def test_first_hit_in_paragraph_wins():
+    text = "Mr John Doe - Pears first. Middle. More. Pears later."
+    assert send_email.extract_matches(text, ["pears"]) == [
+        ("pears", "Pears first. Middle.", "Mr John Doe -"),
+    ]
+
+
+def test_keyword_spanning_a_sentence_break():
+    # The sentence fallback never finds a keyword split across sentences,
+    # same as the original per-sentence search
+    text = "Mr John Doe - I thank Mr. Smith for that. Next point."
+    assert send_email.extract_matches(text, ["Mr. Smith"]) == []
+    assert send_email.extract_matches(text, ["Mr. Smith", "thank"]) == [
+        ("thank", "I thank Mr. Smith for that.", "Mr John Doe -"),
+    ]
+
+
+def test_duplicate_snippets_are_dropped():
+    # Every keyword lands on the same two-sentence snippet
+    text = "Mr John Doe - Apples and pears. Plums elsewhere."
+    assert send_email.extract_matches(text, ["apples", "pears", "plums"]) == [
+        ("apples", "Apples and pears. Plums elsewhere.", "Mr John Doe -"),
+    ]
+    # A duplicate for pears doesn't stop later keywords being matched
+    text = "Mr John Doe - Apples and pears.\n\nA. B. C. D. Plums here."
+    assert send_email.extract_matches(text, ["apples", "pears", "plums"]) == [
+        ("apples", "Apples and pears.", "Mr John Doe -"),
+        ("plums", "D. Plums here.", "Mr John Doe -"),
+    ]
+
+
+def test_matches_reference_on_bundled_transcripts():
+    keywords = [
+        "pokies", "player card", "laundering", "cashless gaming", "harm minimisation",
+        "EGM", "gaming", "Treasurer", "budget", "Mr. Speaker", "health",
+    ]
+    for path in sorted(TRANSCRIPTS.glob("*.txt")):
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        assert send_email.extract_matches(text, keywords) == reference_extract_matches(text, keywords), path.name
+        assert send_email.scan_file(path, keywords) == reference_extract_matches(text, keywords), path.name
+
+
+def test_scan_file_prefilter(tmp_path):
+    path = tmp_path / "transcript.txt"
+    path.write_text("Mr John Doe -\n\nApple is tasty.", encoding="utf-8")
+    assert send_email.scan_file(path, ["Banana"]) == []
+    assert send_email.scan_file(path, ["apple"]) == [("apple", "Apple is tasty.", "Mr John Doe -")]
+
+    empty = tmp_path / "empty.txt"
+    empty.write_text("", encoding="utf-8")
+    assert send_email.scan_file(empty, ["Apple"]) == []
+
+
+def test_load_keywords_file(tmp_path, monkeypatch):
+    (tmp_path / "keywords.txt").write_text(
+        "# general\n"
+        "pokies\n"
+        "\n"
+        "   \n"
+        "# specific phrases (exact)\n"
+        '"cashless gaming"\n'
+        "'harm minimisation'\n"
+        "“player card”\n"
+        '""\n'
+        "EGM\n",
+        encoding="utf-8",
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("KEYWORDS", raising=False)
+    send_email._load_keywords_cached.cache_clear()
+    assert send_email.load_keywords() == (
+        "pokies", "cashless gaming", "harm minimisation", "player card", "EGM",
+    )
+
+
+def test_load_keywords_env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("KEYWORDS", 'pokies, "player card",, # note, EGM')
+    send_email._load_keywords_cached.cache_clear()
+    assert send_email.load_keywords() == ("pokies", "player card", "EGM")
+
+
+def test_parse_date_from_filename():
+    parse = send_email.parse_date_from_filename
+    assert parse("House_of_Assembly_Tuesday_3_June_2025.txt") == datetime(2025, 6, 3)
+    assert parse("House of Assembly Tuesday 3 June 2025.txt") == datetime(2025, 6, 3)
+    assert parse("House_of_Assembly_Tuesday_3_Juno_2025.txt") == datetime.min
+    assert parse("House_of_Assembly_Tuesday_31_June_2025.txt") == datetime.min
+    assert parse("notes.txt") == datetime.min
+
+
+def test_build_digest_orders_by_sitting_date(tmp_path):
+    names = [
+        "House_of_Assembly_Tuesday_9_September_2025.txt",
+        "House_of_Assembly_Tuesday_19_August_2025.txt",
+        "Legislative_Council_Tuesday_3_June_2025.txt",
+    ]
+    for name in names:
+        (tmp_path / name).write_text("Mr John Doe -\n\nApple is tasty.", encoding="utf-8")
+    body, total = send_email.build_digest([str(tmp_path / n) for n in names], ["Apple"])
+    assert total == 3
+    headings = [line for line in body.splitlines() if line.startswith("=== ")]
+    assert headings == [f"=== {name} ===" for name in reversed(names)]